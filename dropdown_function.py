@@ -1,3 +1,4 @@
+import io
 import streamlit as st
 import pandas as pd
 import altair as alt
@@ -5,6 +6,11 @@ import plotly.express as px
 import folium
 from folium.plugins import HeatMap
 from streamlit_folium import st_folium
+from fetch import SOURCES, fetch_source
+from shared_store import load_shared
+from trend_store import ingest
+from memory import compact_frame
+from search_index import SEARCH_COLUMNS, render_search_box
 
 # Helper functions that don't use Streamlit widgets
 def make_donut(input_response, input_text, input_color):
@@ -49,18 +55,12 @@ def make_donut(input_response, input_text, input_color):
     ).properties(width=130, height=130)
     return plot_bg + plot + text
 
-@st.cache_data
-def load_data():
+def fetch_data():
     """Loads data from Google Sheets CSV URL."""
-    # Convert edit URL to export URL
-    sheet_id = "154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k"
-    gid = "553613618"
-    sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-    
     try:
         # Load the data with more robust CSV reading parameters
         df = pd.read_csv(
-            sheet_url,
+            io.BytesIO(fetch_source("adzuna")),
             on_bad_lines='warn',  # Don't fail on problematic lines
             encoding='utf-8',     # Specify encoding
             low_memory=False      # Handle large files better
@@ -95,14 +95,22 @@ def load_data():
             df['salary_min'] = pd.to_numeric(df['salary_min'], errors='coerce')
             df['salary_max'] = pd.to_numeric(df['salary_max'], errors='coerce')
         
-        return df
+        # Fold newly seen postings into the trend aggregates
+        ingest("adzuna", df)
+        
+        # Keep only the columns the dashboard uses, in their smallest dtypes
+        return compact_frame(df, keep_columns=required_columns + SEARCH_COLUMNS)
         
     except Exception:
         return None
 
+def load_data():
+    """Loads the Adzuna data once per host through the shared store."""
+    return load_shared("adzuna", fetch_data, ttl=SOURCES["adzuna"]["ttl"])
+
 def filter_dataframe(df, contract_type, contract_time, category):
     """Filters the DataFrame based on selected options."""
-    df_filtered = df.copy()
+    df_filtered = df.copy(deep=False)  # Shallow: the shared view stays read-only
 
     if 'All' not in category:
         df_filtered = df_filtered[df_filtered['category'].isin(category)]
@@ -291,8 +299,9 @@ def main():
             "Contract Time", options=contract_time_options, default=['All']
         )
 
-        # Apply filters
-        filtered_df = filter_dataframe(df_full, contract_type_filter, contract_time_filter, category_filter)
+        # Apply keyword search, then filters
+        search_df = render_search_box(df_full, key="adzuna", container=st.sidebar)
+        filtered_df = filter_dataframe(search_df, contract_type_filter, contract_time_filter, category_filter)
 
         if not filtered_df.empty:
             # Main Area Dashboard Layout
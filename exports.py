@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import io
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils import SizedCache, dataset_version
+
+# Rows serialized per chunk so large frames never become one giant CSV string
+EXPORT_CHUNK_ROWS = 50_000
+
+EXPORT_FORMATS = {
+    "CSV (gzip)": {"extension": "csv.gz", "mime": "application/gzip"},
+    "Parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yields the frame as CSV text, one block of rows at a time."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=(start == 0))
+
+def write_gzip_csv(df, fileobj, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Streams the frame into fileobj as gzip-compressed CSV."""
+    with gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6, mtime=0) as gz:
+        for chunk in iter_csv_chunks(df, chunk_rows):
+            gz.write(chunk.encode("utf-8"))
+
+def write_parquet(df, fileobj, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes the frame into fileobj as Parquet, one row group per chunk."""
+    df.to_parquet(fileobj, index=False, compression="zstd", row_group_size=chunk_rows)
+
+# Columns dashboards add to the loaded sheet before exporting it
+DERIVED_COLUMNS = ["lat", "lon"]
+
+def export_digest(df, rows):
+    """Short hash of what an export holds beyond the dataset version: the
+    derived coordinates and the selected rows."""
+    digest = hashlib.sha1()
+    for col in DERIVED_COLUMNS:
+        if col in df.columns:
+            digest.update(pd.util.hash_pandas_object(df[col], index=False).values.tobytes())
+    if rows is not None:
+        digest.update(np.packbits(np.asarray(rows, dtype=bool)).tobytes())
+    return digest.hexdigest()[:16]
+
+# Built artifacts keyed by (version, digest, n_rows, fmt), least recently used dropped first
+_export_cache = SizedCache(max_entries=8, sizeof=len)
+
+def build_export(df, rows, version, digest, n_rows, fmt):
+    """Serializes a dataset for download, cached per dataset version, derived
+    columns, selected rows and format."""
+    key = (version, digest, n_rows, fmt)
+    data = _export_cache.get(key)
+    if data is not None:
+        return data
+
+    if rows is not None:
+        df = df[rows]
+    buffer = io.BytesIO()
+    if fmt == "Parquet":
+        write_parquet(df, buffer)
+    else:
+        write_gzip_csv(df, buffer)
+    return _export_cache.put(key, buffer.getvalue())
+
+def export_cache_bytes():
+    """Bytes held by cached export artifacts."""
+    return _export_cache.total_bytes()
+
+def evict_exports(nbytes):
+    """Frees at least nbytes of cached exports if possible; returns bytes freed."""
+    return _export_cache.evict_bytes(nbytes)
+
+def clear_export_cache():
+    _export_cache.clear()
+
+def render_download(df, file_stem, key, rows=None):
+    """Shows an on-demand export control; data is only serialized when requested.
+
+    rows is an optional boolean mask; the selected subset is only materialized
+    when an export is actually built.
+    """
+    version = dataset_version(df)
+    # Re-geocoding changes coordinates and rows without changing the version
+    digest = export_digest(df, rows)
+    n_rows = len(df) if rows is None else int(rows.sum())
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        fmt = st.selectbox("Download format:", list(EXPORT_FORMATS), key=f"{key}-format")
+    with col2:
+        prepare = st.button("📦 Prepare Download", key=f"{key}-prepare")
+
+    # Remember which export was requested so it survives the rerun after clicking
+    requested_key = f"{key}-requested"
+    if prepare:
+        st.session_state[requested_key] = (version, digest, n_rows, fmt)
+
+    if st.session_state.get(requested_key) != (version, digest, n_rows, fmt):
+        return
+
+    try:
+        data = build_export(df, rows, version, digest, n_rows, fmt)
+    except ImportError:
+        st.warning("⚠️ Parquet export needs pyarrow installed. Choose CSV instead.")
+        return
+
+    details = EXPORT_FORMATS[fmt]
+    st.download_button(
+        f"Download Geocoded Data ({fmt}, {len(data) / 1024:.0f} KB)",
+        data,
+        f"{file_stem}.{details['extension']}",
+        details["mime"],
+        key=f"{key}-download"
+    )
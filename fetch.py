@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from shared_store import load_shared, needs_refresh, on_invalidate, registered_loaders
+
+# Every dashboard's Google Sheet, with how long its data stays fresh (None = until refreshed).
+# JOB_HEATMAP_<NAME>_URL overrides a URL, e.g. to point at a local test server.
+SOURCES = {
+    "adzuna": {
+        "url": "https://docs.google.com/spreadsheets/d/154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/export?format=csv&gid=553613618",
+        "ttl": None,
+    },
+    "jora": {
+        "url": "https://docs.google.com/spreadsheets/d/1iFZ71DNkAtlJL_HsHG6oT98zG4zhE6RrT2bbIBVitUA/gviz/tq?tqx=out:csv",
+        "ttl": 600,
+    },
+    "seek": {
+        "url": "https://docs.google.com/spreadsheets/d/154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/gviz/tq?tqx=out:csv",
+        "ttl": 600,
+    },
+    "indeed": {
+        "url": "https://docs.google.com/spreadsheets/d/154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/edit?gid=1226572698#gid=1226572698",
+        "ttl": 14400,
+    },
+}
+for _name, _source in SOURCES.items():
+    _source["url"] = os.environ.get(f"JOB_HEATMAP_{_name.upper()}_URL", _source["url"])
+
+CONNECT_TIMEOUT = 5   # seconds
+READ_TIMEOUT = 30     # seconds
+RETRIES = 3
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+_inflight = {}   # name -> Future of a download in progress
+_loading = set()  # sources being refreshed in the background
+_fetch_lock = threading.Lock()
+# Separate pools: background loads wait on dataset locks, downloads never do
+_download_pool = ThreadPoolExecutor(max_workers=len(SOURCES), thread_name_prefix="fetch")
+_load_pool = ThreadPoolExecutor(max_workers=len(SOURCES), thread_name_prefix="prefetch")
+_background = threading.local()
+
+def get_session():
+    """Returns the process-wide HTTP session with a keep-alive connection pool."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(pool_connections=len(SOURCES), pool_maxsize=len(SOURCES) * 2, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # Sheets exports compress well; requests decodes gzip transparently
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "User-Agent": "job-heatmap/1.0"})
+            _session = session
+        return _session
+
+def fetch_url(url, session=None):
+    """Downloads one URL and returns the (decompressed) response body."""
+    session = session or get_session()
+    response = session.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    response.raise_for_status()
+    return response.content
+
+def _forget_download(name):
+    """Makes the next fetch_source(name) start a new download, e.g. after a refresh."""
+    with _fetch_lock:
+        _inflight.pop(name, None)
+
+on_invalidate(_forget_download)
+
+def _load_in_background(name, loader, ttl):
+    """Pool task: refreshes another source through the shared store."""
+    _background.active = True
+    try:
+        # A failed speculative load must not push back the source's own loads
+        load_shared(name, loader, ttl, record_failure=False)
+    except Exception as e:
+        logger.warning("Background refresh of %s failed: %s", name, e)
+    finally:
+        _background.active = False
+        with _fetch_lock:
+            _loading.discard(name)
+
+def _refresh_others(name):
+    """Starts background loads for the other sources this process serves that are due.
+
+    Only sources whose dashboards have already been loaded here have a
+    registered loader, so nothing is downloaded that no page will use, and
+    the result is published to the shared store for every worker.
+    """
+    for other, (loader, ttl) in registered_loaders().items():
+        if other == name or other not in SOURCES:
+            continue
+        with _fetch_lock:
+            if other in _loading:
+                continue
+            _loading.add(other)
+        if needs_refresh(other, ttl):
+            _load_pool.submit(_load_in_background, other, loader, ttl)
+        else:
+            with _fetch_lock:
+                _loading.discard(other)
+
+def fetch_source(name):
+    """Returns the raw CSV bytes for one configured source.
+
+    Concurrent callers share one download per source. A foreground call also
+    refreshes the other due sources in the background, so visiting those
+    dashboards afterwards needs no round trip. Downloads happen outside the
+    lock; callers only wait on the source they asked for.
+    """
+    with _fetch_lock:
+        future = _inflight.get(name)
+        if future is None:
+            future = _inflight[name] = _download_pool.submit(fetch_url, SOURCES[name]["url"])
+
+    if not getattr(_background, "active", False):
+        _refresh_others(name)
+
+    try:
+        return future.result()
+    finally:
+        with _fetch_lock:
+            if _inflight.get(name) is future:
+                del _inflight[name]
@@ -5,43 +5,94 @@ from streamlit_folium import folium_static
 from geopy.geocoders import Photon  # More stable geocoding service
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 import time
+import io
+from fetch import SOURCES, fetch_source
+from trend_store import ingest
+from shared_store import load_shared
+from progressive_geocoder import BackgroundGeocoder
+from search_index import render_search_box
+from memory import attach_coordinates, compact_frame
 
 # Set up Photon geocoder (alternative to Nominatim)
 geolocator = Photon(user_agent="vic_job_analysis")
 
-# Google Sheets URL (Make sure it's a public CSV link)
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/edit?gid=1226572698#gid=1226572698"
-
-@st.cache_data(ttl=14400)  # Cache data for 4 hours
-def load_data():
+def fetch_data():
     """Load job location data from Google Sheets."""
     try:
-        df = pd.read_csv(GOOGLE_SHEET_URL)
+        df = pd.read_csv(io.BytesIO(fetch_source("indeed")))
         df.columns = df.columns.str.strip().str.lower()  # Normalize column names
         if "location" not in df.columns:
             st.error("⚠️ 'location' column missing in the dataset!")
             return None
-        return df
+        ingest("indeed", df)  # Fold newly seen postings into the trend aggregates
+        return compact_frame(df)
     except Exception as e:
         st.error(f"⚠️ Failed to load data: {str(e)}")
         return None
 
-@st.cache_data(ttl=14400)  # Cache geocoded results
-def geocode_location(location):
+def load_data():
+    """Load job data through the shared store, refreshing per fetch.SOURCES."""
+    return load_shared("indeed", fetch_data, ttl=SOURCES["indeed"]["ttl"])
+
+# How long geocoded results are reused (4 hours) and how often a timeout is retried
+GEOCODE_TTL = 14400
+GEOCODE_ATTEMPTS = 3
+
+def lookup_location(location):
     """Convert location names to latitude & longitude using Photon."""
-    try:
-        full_location = f"{location}, Victoria, Australia"  # Ensure correct region
-        location_data = geolocator.geocode(full_location, timeout=10)
-        if location_data:
-            return location_data.latitude, location_data.longitude
-    except (GeocoderTimedOut, GeocoderServiceError):
-        st.warning(f"⚠️ Geocoding timed out for {location}. Retrying in 2 seconds...")
-        time.sleep(2)
-        return geocode_location(location)
-    except Exception as e:
-        st.warning(f"⚠️ Geocoding failed for {location}: {str(e)}")
+    # Runs on background threads too, so no Streamlit calls in here
+    full_location = f"{location}, Victoria, Australia"  # Ensure correct region
+    for attempt in range(GEOCODE_ATTEMPTS):
+        try:
+            location_data = geolocator.geocode(full_location, timeout=10)
+            if location_data:
+                return location_data.latitude, location_data.longitude
+            break
+        except (GeocoderTimedOut, GeocoderServiceError):
+            if attempt + 1 < GEOCODE_ATTEMPTS:
+                time.sleep(2)
+        except Exception:
+            break
     return None, None
 
+@st.cache_data(ttl=GEOCODE_TTL)  # Cache geocoded results
+def geocode_location(location):
+    """Cached lookup_location for the blocking (non-progressive) path."""
+    return lookup_location(location)
+
+@st.cache_resource
+def get_background_geocoder():
+    """One background geocoder per process, shared by all sessions."""
+    # Uses the uncached lookup: the geocoder keeps its own TTL and retries failures
+    return BackgroundGeocoder(lookup_location, ttl=GEOCODE_TTL)
+
+def render_map(df, geocoded_locations):
+    """Render the heatmap for the rows whose location has coordinates."""
+    has_coords = attach_coordinates(df, geocoded_locations)  # Mask rows with missing coordinates
+
+    # Create Map
+    st.subheader("📍 Job Posting Density Heatmap For Seek")
+    m = folium.Map(location=[-37.8136, 144.9631], zoom_start=6)  # Default: Melbourne, VIC
+
+    # Add Heatmap
+    from folium.plugins import HeatMap
+    heat_data = df.loc[has_coords, ["lat", "lon"]].values.tolist()
+    HeatMap(heat_data, radius=15, blur=10).add_to(m)
+
+    # Display Map
+    folium_static(m)
+
+def render_progressive_map(df, locations, geocoder, was_pending):
+    """Render the map from whatever is geocoded so far (runs as a fragment)."""
+    pending = geocoder.pending_count(locations)
+    if pending:
+        st.info(f"⏳ Geocoding in progress: {pending} of {len(locations)} locations pending. The map updates automatically.")
+    elif was_pending:
+        # Everything resolved: rerun the whole app once to stop the fragment timer
+        st.rerun()
+
+    render_map(df, geocoder.known(locations))
+
 def main():
     """Main function to run the job heatmap dashboard."""
     st.subheader("📍 Job Posting Location Analysis (Victoria)")
@@ -51,22 +102,31 @@ def main():
 
     if df is not None:
         st.success("✅ Data Loaded Successfully!")
-        
-        # Apply geocoding with caching
-        df["lat"], df["lon"] = zip(*df["location"].apply(geocode_location))
-        df = df.dropna(subset=["lat", "lon"])  # Remove rows with missing coordinates
-
-        # Create Map
-        st.subheader("📍 Job Posting Density Heatmap For Seek")
-        m = folium.Map(location=[-37.8136, 144.9631], zoom_start=6)  # Default: Melbourne, VIC
-
-        # Add Heatmap
-        from folium.plugins import HeatMap
-        heat_data = df[["lat", "lon"]].values.tolist()
-        HeatMap(heat_data, radius=15, blur=10).add_to(m)
-
-        # Display Map
-        folium_static(m)
+
+        # Narrow the postings by keyword before geocoding and mapping
+        df = render_search_box(df, key="jobs")
+
+        progressive = st.toggle(
+            "Show map while geocoding",
+            value=True,
+            help="Draw already-known locations immediately and add new ones as they are geocoded."
+        )
+
+        if progressive:
+            locations = df["location"].unique()
+            geocoder = get_background_geocoder()
+            geocoder.submit(locations)
+
+            # Keep re-running just the map until every location resolves
+            pending = geocoder.pending_count(locations) > 0
+            st.fragment(run_every=2 if pending else None)(render_progressive_map)(df, locations, geocoder, pending)
+        else:
+            # Apply geocoding with caching
+            geocoded_locations = {location: geocode_location(location) for location in df["location"].unique()}
+            failed = sum(1 for lat, _ in geocoded_locations.values() if lat is None)
+            if failed:
+                st.warning(f"⚠️ Geocoding failed for {failed} of {len(geocoded_locations)} locations.")
+            render_map(df, geocoded_locations)
     else:
         st.error("⚠️ No data available! Please check your Google Sheet connection.")
 
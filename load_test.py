@@ -0,0 +1,323 @@
+"""Headless load test for main.py.
+
+Runs many simulated dashboard sessions concurrently with Streamlit's AppTest,
+against synthetic stand-ins for the Google Sheets and the Photon geocoder, and
+reports rerun latency percentiles, throughput and memory growth per session.
+Heap tracing runs in a separate pass so it never skews the timings. Uncaught
+exceptions and st.error messages count as errors and make the run exit 1.
+
+    python load_test.py --sessions 50 --actions 20 --output report.json
+    python load_test.py --sessions 50 --compare report.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+DASHBOARDS = ["Adzuna Job Analysis", "Jora Job Analysis", "Seek Job Analysis", "Indeed Job Analysis", "Posting Trends"]
+
+# Relative weights of the interactions a simulated user performs
+ACTION_MIX = {
+    "switch_dashboard": 3,
+    "change_filters": 4,
+    "toggle_map_type": 2,
+    "refresh": 1,
+}
+
+SUBURBS = [
+    "Melbourne", "Geelong", "Ballarat", "Bendigo", "Shepparton", "Mildura", "Warrnambool",
+    "Traralgon", "Wodonga", "Frankston", "Dandenong", "Box Hill", "Footscray", "Richmond",
+    "St Kilda", "Werribee", "Sunbury", "Mornington", "Horsham", "Sale",
+]
+CATEGORIES = [
+    "IT Jobs", "Healthcare & Nursing Jobs", "Engineering Jobs", "Teaching Jobs",
+    "Accounting & Finance Jobs", "Retail Jobs", "Hospitality & Catering Jobs", "Trade & Construction Jobs",
+]
+TITLES = ["Data Engineer", "Registered Nurse", "Software Developer", "Teacher", "Accountant",
+          "Store Manager", "Chef", "Electrician", "Civil Engineer", "Business Analyst"]
+COMPANIES = ["Acme Pty Ltd", "Southern Health", "Victoria Uni", "Coles", "Telstra", "BuildCo"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def make_sheets(rows, seed):
+    """Builds synthetic frames shaped like each Google Sheet."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    pick = lambda values: [rng.choice(values) for _ in range(rows)]
+    salary_min = [rng.randrange(50_000, 120_000, 1000) for _ in range(rows)]
+
+    adzuna = pd.DataFrame({
+        "title": pick(TITLES),
+        "company": pick(COMPANIES),
+        "description": [f"{t} role" for t in pick(TITLES)],
+        "latitude": [rng.uniform(-38.5, -34.5) for _ in range(rows)],
+        "longitude": [rng.uniform(141.0, 149.5) for _ in range(rows)],
+        "category": pick(CATEGORIES),
+        "contract_type": pick(["contract", "permanent"]),
+        "contract_time": pick(["full_time", "part_time"]),
+        "day_of_week": pick(DAYS),
+        "salary_min": salary_min,
+        "salary_max": [s + rng.randrange(0, 40_000, 1000) for s in salary_min],
+    })
+    location_sheet = lambda: pd.DataFrame({
+        "Title": pick(TITLES),
+        "Company": pick(COMPANIES),
+        "Location": pick(SUBURBS),
+    })
+    return {
+        "export?format=csv&gid=553613618": adzuna,
+        "1iFZ71DNkAtlJL_HsHG6oT98zG4zhE6RrT2bbIBVitUA": location_sheet(),  # Jora
+        "154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/gviz": location_sheet(),  # Seek
+        "154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/edit": location_sheet(),  # Indeed
+    }
+
+def install_stand_ins(rows, seed, geocode_delay):
+    """Routes sheet downloads and geocoding to local, deterministic fakes."""
+    import fetch
+    from geopy.geocoders import Photon
+
+    sheets = {marker: frame.to_csv(index=False).encode("utf-8") for marker, frame in make_sheets(rows, seed).items()}
+
+    def fetch_url(url, session=None):
+        for marker, body in sheets.items():
+            if marker in url:
+                return body
+        raise ValueError(f"No stand-in sheet for {url}")
+
+    def geocode(self, query, *args, **kwargs):
+        time.sleep(geocode_delay)
+        h = sum(map(ord, query))
+        return SimpleNamespace(latitude=-36.0 - (h % 200) / 100, longitude=143.0 + (h % 400) / 100)
+
+    fetch.fetch_url = fetch_url
+    Photon.geocode = geocode
+
+def find(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+class Session:
+    """One simulated user driving its own AppTest instance."""
+
+    def __init__(self, index, args):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(args.seed + index)
+        self.app = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+        self.samples = []
+        self.errors = []
+
+    def timed(self, action, step):
+        start = time.perf_counter()
+        try:
+            step()
+            if self.app.exception:
+                self.errors.append(f"{action}: {self.app.exception[0].message}")
+            # main.py catches dashboard crashes and failed loads show up as
+            # st.error; the stand-ins never trigger one in a healthy run
+            for error in self.app.error:
+                self.errors.append(f"{action}: {error.value}")
+        except Exception as e:
+            self.errors.append(f"{action}: {e}")
+        self.samples.append((action, (time.perf_counter() - start) * 1000))
+
+    def switch_dashboard(self):
+        radio = find(self.app.radio, "Select Dashboard:")
+        self.timed("switch_dashboard", lambda: radio.set_value(self.rng.choice(DASHBOARDS)).run())
+
+    def change_filters(self):
+        label = self.rng.choice(["Category", "Contract Type", "Contract Time"])
+        widget = find(self.app.sidebar.multiselect, label)
+        if widget is None:
+            return self.switch_dashboard()
+        choices = [o for o in widget.options if o != "All"]
+        value = ["All"] if not choices or self.rng.random() < 0.3 else self.rng.sample(choices, 1)
+        self.timed("change_filters", lambda: widget.set_value(value).run())
+
+    def toggle_map_type(self):
+        radio = find(self.app.radio, "Map Display Type:")
+        if radio is None:
+            return self.switch_dashboard()
+        self.timed("toggle_map_type", lambda: radio.set_value(self.rng.choice(radio.options)).run())
+
+    def refresh(self):
+        button = find(self.app.button, "🔄 Refresh Data")
+        if button is None:
+            return self.timed("refresh", self.app.run)
+        self.timed("refresh", lambda: button.click().run())
+
+    def play(self, actions):
+        self.timed("initial_load", self.app.run)
+        names, weights = zip(*ACTION_MIX.items())
+        for _ in range(actions):
+            getattr(self, self.rng.choices(names, weights)[0])()
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": round(cuts[49], 2),
+        "p95": round(cuts[94], 2),
+        "p99": round(cuts[98], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], cwd=os.path.dirname(APP_PATH), text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def current_rss_bytes():
+    """Resident set size right now (Linux), falling back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def play_sessions(args, count, offset=0):
+    sessions = [Session(offset + i, args) for i in range(count)]
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        list(pool.map(lambda s: s.play(args.actions), sessions))
+    return sessions
+
+def measure_session_memory(args):
+    """Separate, untimed pass: Python heap retained per live session.
+
+    tracemalloc slows every allocation, so it never runs while latency and
+    throughput are being measured.
+    """
+    count = min(args.memory_sessions, args.sessions)
+    if count <= 0:
+        return None, None
+    tracemalloc.start()
+    baseline_bytes = tracemalloc.get_traced_memory()[0]
+    sessions = play_sessions(args, count, offset=args.sessions)
+    # Sessions are still alive here, so this is the state they retain
+    retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sessions
+    return (retained_bytes - baseline_bytes) / count, peak_bytes
+
+def run(args):
+    # Isolate the shared dataset and trend stores from any real deployment on this host
+    os.environ["JOB_HEATMAP_SHM_DIR"] = tempfile.mkdtemp(prefix="job_heatmap_load_test_")
+    os.environ["JOB_HEATMAP_TREND_DIR"] = tempfile.mkdtemp(prefix="job_heatmap_load_test_trends_")
+    install_stand_ins(args.rows, args.seed, args.geocode_delay)
+
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    sessions = play_sessions(args, args.sessions)
+    elapsed = time.perf_counter() - start
+    # Timed sessions are still alive, so this growth includes their state
+    rss_growth = current_rss_bytes() - rss_before
+
+    retained_per_session, peak_bytes = measure_session_memory(args)
+
+    samples = [sample for s in sessions for sample in s.samples]
+    errors = [error for s in sessions for error in s.errors]
+    by_action = {}
+    for action, ms in samples:
+        by_action.setdefault(action, []).append(ms)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "sessions": args.sessions,
+            "actions": args.actions,
+            "rows": args.rows,
+            "seed": args.seed,
+        },
+        "latency_ms": percentiles([ms for _, ms in samples]),
+        "latency_ms_by_action": {action: percentiles(v) for action, v in sorted(by_action.items())},
+        "throughput_reruns_per_s": round(len(samples) / elapsed, 2) if elapsed else None,
+        "elapsed_s": round(elapsed, 2),
+        "errors": {"count": len(errors), "sample": errors[:10]},
+        "memory": {
+            "rss_growth_mb": round(rss_growth / 2**20, 2),
+            "rss_growth_kb_per_session": round(rss_growth / 1024 / args.sessions, 1),
+            "memory_pass_sessions": min(args.memory_sessions, args.sessions),
+            "retained_kb_per_session": round(retained_per_session / 1024, 1) if retained_per_session is not None else None,
+            "peak_traced_mb": round(peak_bytes / 2**20, 2) if peak_bytes is not None else None,
+            # ru_maxrss is KiB on Linux
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+    }
+
+def print_report(report, previous=None):
+    def line(name, current, old):
+        delta = ""
+        if old not in (None, 0) and current is not None:
+            delta = f"  ({(current - old) / old * 100:+.1f}% vs {old})"
+        print(f"  {name:<28}{current}{delta}")
+
+    previous = previous or {}
+    print(f"Load test @ {report['meta']['revision']}: {report['meta']['sessions']} sessions "
+          f"x {report['meta']['actions']} actions in {report['elapsed_s']}s")
+    for key in ("p50", "p95", "p99"):
+        line(f"rerun latency {key} (ms)", report["latency_ms"].get(key),
+             previous.get("latency_ms", {}).get(key))
+    line("throughput (reruns/s)", report["throughput_reruns_per_s"], previous.get("throughput_reruns_per_s"))
+    line("memory per session (KB)", report["memory"]["retained_kb_per_session"],
+         previous.get("memory", {}).get("retained_kb_per_session"))
+    line("RSS growth per session (KB)", report["memory"]["rss_growth_kb_per_session"],
+         previous.get("memory", {}).get("rss_growth_kb_per_session"))
+    line("max RSS (MB)", report["memory"]["max_rss_mb"], previous.get("memory", {}).get("max_rss_mb"))
+    line("errors", report["errors"]["count"], previous.get("errors", {}).get("count"))
+    for action, stats in report["latency_ms_by_action"].items():
+        print(f"    {action:<26}p50={stats['p50']}  p95={stats['p95']}  p99={stats['p99']}  n={stats['count']}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--actions", type=int, default=20, help="interactions per session")
+    parser.add_argument("--memory-sessions", type=int, default=10,
+                        help="sessions in the separate, untimed tracemalloc pass (0 to skip)")
+    parser.add_argument("--rows", type=int, default=5000, help="rows per synthetic sheet")
+    parser.add_argument("--geocode-delay", type=float, default=0.005, help="seconds per fake geocode")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"]["count"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import streamlit as st
 import importlib
 import os
+from memory import render_memory_panel
 # Set environment variable to prevent app from sleeping
 os.environ['STREAMLIT_SERVER_HEADLESS'] = 'true'
 # this is the FIRST Streamlit command
@@ -17,14 +18,15 @@ st.title("Job Market Analysis Dashboards")
 # Create a radio button to select the dashboard
 dashboard_selection = st.radio(
     "Select Dashboard:",
-    ("Adzuna Job Analysis", "Jora Job Analysis", "Seek Job Analysis", "Indeed Job Analysis")
+    ("Adzuna Job Analysis", "Jora Job Analysis", "Seek Job Analysis", "Indeed Job Analysis", "Posting Trends")
 )
 # Dictionary mapping selection to module names
 modules = {
     "Adzuna Job Analysis": "dropdown_function",
     "Jora Job Analysis": "jora_heatmap",
     "Seek Job Analysis": "seek_heatmap",
-    "Indeed Job Analysis": "indeed_heatmap"
+    "Indeed Job Analysis": "indeed_heatmap",
+    "Posting Trends": "trend_dashboard"
 }
 module_name = modules[dashboard_selection]
 # Import the selected module - do NOT cache this!
@@ -44,3 +46,6 @@ except Exception as e:
     # More detailed error handling for debugging
     import traceback
     st.code(traceback.format_exc())
+
+# Memory per dataset, column and cache, plus the optional JOB_HEATMAP_MEMORY_CAP_MB cap
+render_memory_panel()
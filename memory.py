@@ -0,0 +1,168 @@
+import os
+import pandas as pd
+import streamlit as st
+import exports
+import search_index
+import shared_store
+
+COORDINATE_COLUMNS = {"latitude", "longitude", "lat", "lon"}
+SALARY_COLUMNS = {"salary_min", "salary_max"}
+
+# Optional budget for the export and search caches; least recently used
+# entries are evicted when they exceed it
+MEMORY_CAP_MB = float(os.environ.get("JOB_HEATMAP_MEMORY_CAP_MB", "0")) or None
+
+def _compact_integers(values):
+    # No narrower than int32: salary midpoints like (min + max) / 2 overflow int16
+    values = pd.to_numeric(values, downcast="integer")
+    if values.dtype.itemsize < 4:
+        values = values.astype("int32")
+    return values
+
+def _compact_salary(values):
+    """Smallest exact representation for a salary column."""
+    values = pd.to_numeric(values, errors="coerce")
+    if values.notna().all() and (values % 1 == 0).all():
+        return _compact_integers(values)
+    # float32 holds every whole-dollar salary below $16.7M exactly
+    return values.astype("float32")
+
+def _compact_text(values):
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        # Sheets mix numbers and text; keep one type so the column stays Arrow-friendly
+        values = values.where(values.isna(), values.astype(str))
+    return values
+
+def compact_frame(df, keep_columns=None):
+    """Returns a smaller copy of df: unused columns dropped, float32 coordinates
+    and downcast salaries and integers.
+
+    Text is left as text: the shared store keeps it as Arrow strings that
+    every worker maps without copying.
+    """
+    if keep_columns is not None:
+        df = df[[col for col in df.columns if col in keep_columns]]
+    df = df.copy()
+
+    for col in df.columns:
+        values = df[col]
+        if col in COORDINATE_COLUMNS:
+            df[col] = pd.to_numeric(values, errors="coerce").astype("float32")
+        elif col in SALARY_COLUMNS:
+            df[col] = _compact_salary(values)
+        elif pd.api.types.is_integer_dtype(values):
+            df[col] = _compact_integers(values)
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            df[col] = _compact_text(values)
+    return df
+
+def attach_coordinates(df, geocoded_locations):
+    """Adds float32 lat/lon columns to df from a {location: (lat, lon)} dict.
+
+    Returns a boolean mask of rows that have coordinates, so callers can select
+    them lazily instead of keeping a second filtered copy of the frame.
+    """
+    coords = pd.DataFrame.from_dict(
+        geocoded_locations, orient="index", columns=["lat", "lon"]
+    ).astype("float32")
+    located = coords.reindex(pd.Index(df["location"]))
+    df["lat"] = located["lat"].to_numpy()
+    df["lon"] = located["lon"].to_numpy()
+    return (df["lat"].notna() & df["lon"].notna()).to_numpy()
+
+def column_bytes(df):
+    """Bytes used by each column of df, including string payloads."""
+    usage = df.memory_usage(deep=True, index=False)
+    return {str(col): int(nbytes) for col, nbytes in usage.items()}
+
+def _is_mapped(values):
+    """True if a column of an attached frame reads straight from the shared file."""
+    if isinstance(values.dtype, pd.StringDtype) and values.dtype.storage == "pyarrow":
+        return True
+    # split_blocks wraps null-free numeric columns as read-only views of the mapping
+    array = values.to_numpy(copy=False) if values.dtype.kind in "biuf" else None
+    return array is not None and not array.flags.writeable
+
+def dataset_report(df, shared=False):
+    """Rows and bytes of df. With shared=True, columns mapped from the shared
+    store count towards shared_bytes instead of bytes (process-private)."""
+    columns = column_bytes(df)
+    mapped = {str(col) for col in df.columns if shared and _is_mapped(df[col])}
+    return {
+        "rows": len(df),
+        "bytes": sum(n for col, n in columns.items() if col not in mapped) + int(df.index.memory_usage(deep=True)),
+        "shared_bytes": sum(n for col, n in columns.items() if col in mapped),
+        "columns": columns,
+    }
+
+def memory_report():
+    """Reports bytes per dataset (and per column) and per cache in this process.
+
+    Dataset bytes are what this process holds privately; columns read
+    straight from the shared store are mapped by every worker and reported
+    separately as shared_bytes. The cap applies to the caches only.
+    """
+    datasets = {
+        name: dataset_report(df, shared=True)
+        for name, (_, df) in shared_store.attached_frames().items()
+    }
+    caches = {
+        "exports": exports.export_cache_bytes(),
+        "search_index": search_index.index_cache_bytes(),
+    }
+    total = sum(d["bytes"] for d in datasets.values()) + sum(caches.values())
+    return {
+        "datasets": datasets,
+        "caches": caches,
+        "cache_bytes": sum(caches.values()),
+        "total_bytes": total,
+        "cap_bytes": cap_bytes(),
+    }
+
+def cap_bytes():
+    return int(MEMORY_CAP_MB * 2**20) if MEMORY_CAP_MB else None
+
+def enforce_memory_cap(report=None):
+    """Evicts least recently used exports, then search indexes, until the
+    caches fit the cap.
+
+    Returns the bytes freed. Datasets are never evicted (every page needs
+    them), and each cache keeps its most recent entry for the current page.
+    """
+    cap = cap_bytes()
+    if cap is None:
+        return 0
+    report = report or memory_report()
+    excess = report["cache_bytes"] - cap
+    if excess <= 0:
+        return 0
+    freed = exports.evict_exports(excess)
+    if freed < excess:
+        freed += search_index.evict_indexes(excess - freed)
+    return freed
+
+def _mb(nbytes):
+    return f"{nbytes / 2**20:,.2f} MB"
+
+def render_memory_panel(container=st.sidebar):
+    """Shows memory per dataset, column and cache, and applies the cap."""
+    report = memory_report()
+    freed = enforce_memory_cap(report)
+    if freed:
+        container.info(f"Cache budget of {_mb(report['cap_bytes'])} exceeded; "
+                       f"evicted {_mb(freed)} of least recently used exports and search indexes.")
+        report = memory_report()
+
+    with container.expander("Memory usage"):
+        st.write(f"Tracked total: {_mb(report['total_bytes'])} private")
+        cap = f" of {_mb(report['cap_bytes'])} cap" if report["cap_bytes"] else ""
+        st.write(f"Caches: {_mb(report['cache_bytes'])}{cap}")
+
+        for name, dataset in report["datasets"].items():
+            st.write(f"**{name}**: {dataset['rows']:,} rows, {_mb(dataset['bytes'])} private, "
+                     f"{_mb(dataset['shared_bytes'])} shared")
+            columns = pd.Series(dataset["columns"], name="bytes").sort_values(ascending=False)
+            st.dataframe(columns.map(_mb), use_container_width=True)
+
+        for name, nbytes in report["caches"].items():
+            st.write(f"Cache **{name}**: {_mb(nbytes)}")
@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class BackgroundGeocoder:
+    """Geocodes locations on a worker pool and exposes whatever is known so far.
+
+    Dashboards render from known() straight away and rerun while
+    pending_count() is non-zero, so the map fills in as results arrive.
+    Results are looked up again after ttl seconds and failed lookups after
+    retry_failed_after. Those refreshes run quietly: the old result keeps
+    being served and pending_count() only counts first-time lookups.
+    """
+
+    def __init__(self, geocode, ttl=86400, retry_failed_after=300, max_workers=4):
+        self._geocode = geocode
+        self._ttl = ttl
+        self._retry_failed_after = retry_failed_after
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geocoder")
+        self._known = {}  # location -> ((lat, lon), expires_at)
+        self._pending = set()     # first-time lookups
+        self._refreshing = set()  # re-lookups of expired or failed entries
+        self._lock = threading.Lock()
+
+    def _is_current(self, location, now):
+        entry = self._known.get(location)
+        return entry is not None and entry[1] > now
+
+    def submit(self, locations):
+        """Queues every location that is unresolved or expired and not already queued."""
+        now = time.time()
+        with self._lock:
+            new_locations = [
+                location for location in locations
+                if not self._is_current(location, now)
+                and location not in self._pending and location not in self._refreshing
+            ]
+            for location in new_locations:
+                (self._refreshing if location in self._known else self._pending).add(location)
+
+        for location in new_locations:
+            self._pool.submit(self._resolve, location)
+        return len(new_locations)
+
+    def _resolve(self, location):
+        try:
+            coords = self._geocode(location)
+        except Exception:
+            coords = (None, None)
+        with self._lock:
+            if coords[0] is not None:
+                self._known[location] = (coords, time.time() + self._ttl)
+            else:
+                # Keep serving earlier coordinates if a refresh fails
+                previous = self._known.get(location, ((None, None), 0))[0]
+                self._known[location] = (previous, time.time() + self._retry_failed_after)
+            self._pending.discard(location)
+            self._refreshing.discard(location)
+
+    def known(self, locations):
+        """Returns {location: (lat, lon)} for the locations resolved so far."""
+        with self._lock:
+            return {location: self._known[location][0] for location in locations if location in self._known}
+
+    def pending_count(self, locations):
+        """Counts how many of the given locations are waiting for their first result."""
+        with self._lock:
+            return sum(1 for location in locations if location in self._pending)
+
+    def forget_failed(self):
+        """Expires failed lookups now so the next submit() retries them."""
+        with self._lock:
+            for location, (coords, _) in list(self._known.items()):
+                if coords[0] is None:
+                    self._known[location] = (coords, 0)
@@ -0,0 +1,156 @@
+import re
+import sys
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+from utils import SizedCache, dataset_version
+
+# Columns searched when present; otherwise every text column is indexed
+SEARCH_COLUMNS = ["title", "job_title", "description", "company", "company_name", "category"]
+
+# Same token definition on both sides: runs of letters/digits, lower-cased
+ARROW_SEPARATOR = r"[^\p{L}\p{N}]+"
+QUERY_SEPARATOR = re.compile(r"[\W_]+")
+
+def tokenize(text):
+    """Splits a search query into lower-case tokens."""
+    return [token for token in QUERY_SEPARATOR.split(str(text).lower()) if token]
+
+def _column_tokens(values):
+    """Returns (tokens, row positions) for every token in a column."""
+    try:
+        arr = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed numbers and text in one sheet column
+        arr = pa.array(values.astype(str).where(values.notna()), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        # Parent indices are per chunk, so work on one contiguous array
+        arr = arr.combine_chunks()
+    if not pa.types.is_string(arr.type) and not pa.types.is_large_string(arr.type):
+        arr = pc.cast(arr, pa.large_string())
+
+    lists = pc.split_pattern_regex(pc.utf8_lower(arr), ARROW_SEPARATOR)
+    tokens = pc.list_flatten(lists)
+    rows = pc.list_parent_indices(lists)
+
+    keep = pc.not_equal(tokens, "")
+    return pc.filter(tokens, keep), pc.filter(rows, keep).to_numpy()
+
+class InvertedIndex:
+    """Token -> sorted array of row positions, stored as one CSR-style block."""
+
+    def __init__(self, vocabulary, offsets, postings, n_rows):
+        self.vocabulary = vocabulary  # token -> term id
+        self.offsets = offsets        # postings[offsets[t]:offsets[t + 1]] belong to term t
+        self.postings = postings
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, df, columns):
+        n_rows = len(df)
+        token_chunks, row_chunks = [], []
+        for col in columns:
+            tokens, rows = _column_tokens(df[col])
+            token_chunks.append(tokens)
+            row_chunks.append(rows)
+
+        if not token_chunks:
+            return cls({}, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), n_rows)
+
+        all_tokens = pa.chunked_array(
+            [chunk.cast(pa.large_string()) for chunk in token_chunks], type=pa.large_string()
+        ).combine_chunks()
+        encoded = all_tokens.dictionary_encode()
+        terms = encoded.dictionary.to_pylist()
+        term_ids = encoded.indices.to_numpy().astype(np.int64)
+        rows = np.concatenate(row_chunks).astype(np.int64)
+
+        # One sort over (term, row) keys groups each term's postings in row order
+        # and drops duplicates when a token occurs in several columns of a row
+        keys = np.unique(term_ids * max(n_rows, 1) + rows)
+        key_terms = keys // max(n_rows, 1)
+        postings = (keys % max(n_rows, 1)).astype(np.int32)
+        offsets = np.searchsorted(key_terms, np.arange(len(terms) + 1))
+
+        vocabulary = {term: i for i, term in enumerate(terms)}
+        return cls(vocabulary, offsets, postings, n_rows)
+
+    def posting_list(self, token):
+        term = self.vocabulary.get(token)
+        if term is None:
+            return self.postings[:0]
+        return self.postings[self.offsets[term]:self.offsets[term + 1]]
+
+    def search(self, query):
+        """Returns sorted row positions containing every token in the query."""
+        lists = sorted((self.posting_list(token) for token in tokenize(query)), key=len)
+        if not lists:
+            return np.arange(self.n_rows, dtype=np.int32)
+
+        result = lists[0]
+        for postings in lists[1:]:
+            if len(result) == 0:
+                break
+            # Probe the longer list with binary search: O(short * log long)
+            idx = np.searchsorted(postings, result)
+            idx[idx == len(postings)] = 0
+            result = result[postings[idx] == result]
+        return result
+
+    @property
+    def nbytes(self):
+        vocabulary_bytes = sys.getsizeof(self.vocabulary) + sum(map(sys.getsizeof, self.vocabulary))
+        return self.postings.nbytes + self.offsets.nbytes + vocabulary_bytes
+
+def search_columns(df):
+    columns = [col for col in SEARCH_COLUMNS if col in df.columns]
+    if columns:
+        return columns
+    return [col for col in df.columns if str(df[col].dtype) in ("object", "string", "category")]
+
+# Built indexes keyed by (version, columns), least recently used dropped first
+_index_cache = SizedCache(max_entries=8, sizeof=lambda index: index.nbytes)
+
+def get_search_index(df, version, columns):
+    """Builds the inverted index once per dataset version."""
+    key = (version, columns)
+    index = _index_cache.get(key)
+    if index is None:
+        with st.spinner("Building search index..."):
+            index = _index_cache.put(key, InvertedIndex.build(df, list(columns)))
+    return index
+
+def index_cache_bytes():
+    """Approximate bytes held by cached search indexes."""
+    return _index_cache.total_bytes()
+
+def evict_indexes(nbytes):
+    """Frees at least nbytes of cached indexes if possible; returns bytes freed."""
+    return _index_cache.evict_bytes(nbytes)
+
+def clear_index_cache():
+    _index_cache.clear()
+
+def render_search_box(df, key, container=st):
+    """Shows a keyword search box and returns the matching rows of df."""
+    query = container.text_input(
+        "Keyword search",
+        key=f"{key}-search",
+        placeholder="e.g. data engineer, nurse",
+    )
+    if not tokenize(query):
+        return df
+
+    version = dataset_version(df)
+    index = get_search_index(df, version, tuple(search_columns(df)))
+    start = time.perf_counter()
+    rows = index.search(query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    container.caption(f"{len(rows)} postings match \"{query}\" ({elapsed_ms:.1f} ms)")
+
+    matches = df.take(rows)
+    # The subset is its own dataset version for downstream caches (e.g. exports)
+    matches.attrs["dataset_version"] = f"{version}:{' '.join(tokenize(query))}"
+    return matches
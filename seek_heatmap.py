@@ -5,34 +5,45 @@ from streamlit_folium import folium_static
 from geopy.geocoders import Photon
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 import time
+import io
 import hashlib
+from exports import render_download
+from fetch import SOURCES, fetch_source
+from trend_store import ingest
+from shared_store import load_shared, invalidate
+from progressive_geocoder import BackgroundGeocoder
+from search_index import render_search_box
+from memory import attach_coordinates, compact_frame
 
 # Set up Photon geocoder (alternative to Nominatim)
 geolocator = Photon(user_agent="vic_job_analysis")
 
-# Updated Google Sheets URL
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/154MnI4PV3-_OIDo2MZWw413gbzw9dVoS-aixCRujR5k/gviz/tq?tqx=out:csv"
-
-@st.cache_data(ttl=600)  # Cache data for 10 minutes instead of 4 hours
-def load_data():
+def fetch_data():
     """Load job location data from Google Sheets."""
     try:
-        df = pd.read_csv(GOOGLE_SHEET_URL)
+        df = pd.read_csv(io.BytesIO(fetch_source("seek")))
         df.columns = df.columns.str.strip().str.lower()  # Normalize column names
         if "location" not in df.columns:
             st.error("⚠️ 'location' column missing in the dataset!")
             return None
-        return df
+        ingest("seek", df)  # Fold newly seen postings into the trend aggregates
+        return compact_frame(df)  # All columns kept: downloads export the full sheet
     except Exception as e:
         st.error(f"⚠️ Failed to load data: {str(e)}")
         return None
 
+def load_data():
+    """Load job data through the shared store, refreshing per fetch.SOURCES."""
+    return load_shared("seek", fetch_data, ttl=SOURCES["seek"]["ttl"])
+
 # Create a hash for each location to help with caching
 def get_location_hash(location):
     return hashlib.md5(location.encode()).hexdigest()
 
-@st.cache_data(ttl=86400)  # Cache geocoded results for 1 day
-def geocode_location(location):
+# How long geocoded results are reused (1 day)
+GEOCODE_TTL = 86400
+
+def lookup_location(location):
     """Convert location names to latitude & longitude using Photon."""
     try:
         full_location = f"{location}, Victoria, Australia"  # Ensure correct region
@@ -52,6 +63,101 @@ def geocode_location(location):
         pass
     return None, None
 
+@st.cache_data(ttl=GEOCODE_TTL)  # Cache geocoded results for 1 day
+def geocode_location(location):
+    """Cached lookup_location for the blocking (non-progressive) path."""
+    return lookup_location(location)
+
+@st.cache_resource
+def get_background_geocoder():
+    """One background geocoder per process, shared by all sessions."""
+    # Uses the uncached lookup: the geocoder keeps its own TTL and retries failures
+    return BackgroundGeocoder(lookup_location, ttl=GEOCODE_TTL)
+
+def geocode_with_progress(locations):
+    """Geocode every location up front, showing a progress bar."""
+    # Create a progress bar for geocoding
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    # Create a geocoding cache dictionary to avoid reprocessing same locations
+    geocoded_locations = {}
+    
+    with st.spinner("Geocoding locations (this may take a moment)..."):
+        for i, location in enumerate(locations):
+            # Update progress
+            progress = int((i + 1) / len(locations) * 100)
+            progress_bar.progress(progress)
+            status_text.text(f"Geocoding {i+1}/{len(locations)}: {location}")
+            
+            # Get coordinates
+            lat, lon = geocode_location(location)
+            geocoded_locations[location] = (lat, lon)
+    
+    return geocoded_locations
+
+def render_progressive_results(df, locations, geocoder, was_pending):
+    """Render the map from whatever is geocoded so far (runs as a fragment)."""
+    pending = geocoder.pending_count(locations)
+    if pending:
+        st.info(f"⏳ Geocoding in progress: {pending} of {len(locations)} locations pending. The map updates automatically.")
+    elif was_pending:
+        # Everything resolved: rerun the whole app once to stop the fragment timer
+        st.rerun()
+    
+    render_results(df, geocoder.known(locations), pending)
+
+def render_results(df, geocoded_locations, pending=0):
+    """Render the heatmap and download for the geocoded job postings."""
+    # Apply the cached coordinates to the dataframe; rows without them are
+    # masked out rather than copied into a second frame
+    has_coords = attach_coordinates(df, geocoded_locations)
+    n_valid = int(has_coords.sum())
+    
+    # Show stats
+    st.text(f"Successfully geocoded {n_valid} out of {len(df)} job postings.")
+    
+    if n_valid > 0:
+        # Create Map
+        st.subheader("📍 Job Posting Density Heatmap For Jora")
+        
+        # Add map type selection
+        map_type = st.radio(
+            "Map Display Type:", 
+            ["Heatmap", "Clustered Markers", "Both"],
+            horizontal=True
+        )
+        
+        m = folium.Map(location=[-37.8136, 144.9631], zoom_start=7)
+        
+        # Add Heatmap
+        if map_type in ["Heatmap", "Both"]:
+            from folium.plugins import HeatMap
+            heat_data = df.loc[has_coords, ["lat", "lon"]].values.tolist()
+            HeatMap(heat_data, radius=15, blur=10).add_to(m)
+        
+        # Add clustered markers
+        if map_type in ["Clustered Markers", "Both"]:
+            from folium.plugins import MarkerCluster
+            marker_cluster = MarkerCluster().add_to(m)
+            
+            for lat, lon, location in df.loc[has_coords, ["lat", "lon", "location"]].itertuples(index=False):
+                folium.Marker(
+                    [lat, lon],
+                    popup=location
+                ).add_to(marker_cluster)
+        
+        # Display Map
+        folium_static(m)
+        
+        # Offer the download once the data set is complete
+        if not pending:
+            render_download(df, "geocoded_job_data", key='download-geocoded', rows=has_coords)
+    elif pending:
+        st.info("🗺️ The map will appear as soon as the first locations are geocoded.")
+    else:
+        st.error("⚠️ No valid geocoded locations found.")
+
 def main():
     """Main function to run the job heatmap dashboard."""
     st.subheader("📍Jora Job Posting Location Analysis (Victoria)")
@@ -81,6 +187,7 @@ def main():
     # Force data reload if refresh button is clicked
     if refresh_button:
         st.cache_data.clear()
+        invalidate("seek")
         st.success("✅ Cache cleared and data refreshed!")
     
     # Load data
@@ -90,80 +197,29 @@ def main():
     if df is not None:
         st.success(f"✅ Data Loaded Successfully! Found {len(df)} job postings.")
         
-        # Create a progress bar for geocoding
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        # Narrow the postings by keyword before geocoding and mapping
+        df = render_search_box(df, key="jobs")
         
-        # Process locations in batches for better performance
         locations = df["location"].unique()
         
-        # Create a geocoding cache dictionary to avoid reprocessing same locations
-        geocoded_locations = {}
-        
-        with st.spinner("Geocoding locations (this may take a moment)..."):
-            for i, location in enumerate(locations):
-                # Update progress
-                progress = int((i + 1) / len(locations) * 100)
-                progress_bar.progress(progress)
-                status_text.text(f"Geocoding {i+1}/{len(locations)}: {location}")
-                
-                # Get coordinates
-                lat, lon = geocode_location(location)
-                geocoded_locations[location] = (lat, lon)
-            
-            # Apply the cached coordinates to the dataframe
-            df["lat"] = df["location"].map(lambda x: geocoded_locations.get(x, (None, None))[0])
-            df["lon"] = df["location"].map(lambda x: geocoded_locations.get(x, (None, None))[1])
-            
-            # Remove rows with missing coordinates
-            valid_data = df.dropna(subset=["lat", "lon"])
-            
-            # Show stats
-            status_text.text(f"Successfully geocoded {len(valid_data)} out of {len(df)} job postings.")
+        progressive = st.toggle(
+            "Show map while geocoding",
+            value=True,
+            help="Draw already-known locations immediately and add new ones as they are geocoded."
+        )
         
-        if len(valid_data) > 0:
-            # Create Map
-            st.subheader("📍 Job Posting Density Heatmap For Jora")
-            
-            # Add map type selection
-            map_type = st.radio(
-                "Map Display Type:", 
-                ["Heatmap", "Clustered Markers", "Both"],
-                horizontal=True
-            )
-            
-            m = folium.Map(location=[-37.8136, 144.9631], zoom_start=7)
-            
-            # Add Heatmap
-            if map_type in ["Heatmap", "Both"]:
-                from folium.plugins import HeatMap
-                heat_data = valid_data[["lat", "lon"]].values.tolist()
-                HeatMap(heat_data, radius=15, blur=10).add_to(m)
-            
-            # Add clustered markers
-            if map_type in ["Clustered Markers", "Both"]:
-                from folium.plugins import MarkerCluster
-                marker_cluster = MarkerCluster().add_to(m)
-                
-                for _, row in valid_data.iterrows():
-                    folium.Marker(
-                        [row["lat"], row["lon"]],
-                        popup=row["location"]
-                    ).add_to(marker_cluster)
-            
-            # Display Map
-            folium_static(m)
+        if progressive:
+            geocoder = get_background_geocoder()
+            if refresh_button:
+                geocoder.forget_failed()
+            geocoder.submit(locations)
             
-            # Download option
-            st.download_button(
-                "Download Geocoded Data (CSV)",
-                valid_data.to_csv(index=False).encode('utf-8'),
-                "geocoded_job_data.csv",
-                "text/csv",
-                key='download-csv'
-            )
+            # Keep re-running just the map section until every location resolves
+            pending = geocoder.pending_count(locations) > 0
+            st.fragment(run_every=2 if pending else None)(render_progressive_results)(df, locations, geocoder, pending)
         else:
-            st.error("⚠️ No valid geocoded locations found.")
+            geocoded_locations = geocode_with_progress(locations)
+            render_results(df, geocoded_locations)
     else:
         st.error("⚠️ No data available! Please check your Google Sheet connection.")
 
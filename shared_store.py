@@ -0,0 +1,217 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import pandas as pd
+import pyarrow as pa
+from utils import dataset_version, file_lock
+
+# Datasets are published once per host as Arrow IPC files in shared memory
+# (/dev/shm when available) and memory-mapped read-only by every worker.
+def _default_dir():
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/job_heatmap"
+    return os.path.join(tempfile.gettempdir(), "job_heatmap")
+
+SHARED_DIR = os.environ.get("JOB_HEATMAP_SHM_DIR") or _default_dir()
+
+# Frames this process has attached, keyed by dataset name
+_attached = {}
+_attached_lock = threading.Lock()
+
+# Backoff between attempts after a loader fails: 30s, 60s, 120s ... up to 15 minutes
+RETRY_BASE = 30
+RETRY_MAX = 900
+
+def _pointer_path(name):
+    return os.path.join(SHARED_DIR, f"{name}.current")
+
+def _failure_path(name):
+    return os.path.join(SHARED_DIR, f"{name}.failed")
+
+def _write_json(path, obj):
+    """Writes obj to path atomically; readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _publish_lock(name):
+    """Exclusive per-dataset lock shared by all workers on the host."""
+    return file_lock(os.path.join(SHARED_DIR, f"{name}.lock"))
+
+def _to_arrow(df):
+    """Converts a frame to an Arrow table with large_string text columns."""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Sheets can mix numbers and text in one column; store those as text
+        df = df.copy()
+        for col in df.select_dtypes(include="object").columns:
+            df[col] = df[col].astype("string")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # pandas' pyarrow strings are backed by large_string; storing that type
+    # lets workers wrap the mapped buffers without a cast
+    fields = [
+        field.with_type(pa.large_string()) if pa.types.is_string(field.type) else field
+        for field in table.schema
+    ]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+def current(name):
+    """Returns the pointer to the latest published version, or None."""
+    return _read_json(_pointer_path(name))
+
+def publish(name, df):
+    """Writes a dataset into shared memory and atomically makes it current."""
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    version = dataset_version(df)
+    path = os.path.join(SHARED_DIR, f"{name}-{version}.arrow")
+
+    if not os.path.exists(path):
+        table = _to_arrow(df)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    info = {"name": name, "version": version, "path": path, "published_at": time.time()}
+    # Readers see either the old pointer or the new one, never a partial file
+    _write_json(_pointer_path(name), info)
+    _clear_failure(name)
+
+    _prune(name, keep=path)
+    return info
+
+def _prune(name, keep):
+    """Removes superseded versions; workers still mapping them keep their view."""
+    prefix = f"{name}-"
+    for entry in os.listdir(SHARED_DIR):
+        path = os.path.join(SHARED_DIR, entry)
+        if entry.startswith(prefix) and entry.endswith(".arrow") and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _record_failure(name):
+    """Remembers a failed load and schedules the next attempt with backoff."""
+    failures = (_read_json(_failure_path(name)) or {}).get("failures", 0) + 1
+    delay = min(RETRY_BASE * 2 ** (failures - 1), RETRY_MAX)
+    _write_json(_failure_path(name), {"failures": failures, "retry_at": time.time() + delay})
+
+def _clear_failure(name):
+    try:
+        os.remove(_failure_path(name))
+    except OSError:
+        pass
+
+def _retry_due(name):
+    failure = _read_json(_failure_path(name))
+    return failure is None or time.time() >= failure["retry_at"]
+
+# Loader and ttl each dataset was last loaded with in this process
+_loaders = {}
+
+def registered_loaders():
+    """Returns {name: (loader, ttl)} for every dataset loaded in this process."""
+    return dict(_loaders)
+
+# Callbacks run on invalidate(name), e.g. to drop downloads in flight in this process
+_invalidate_hooks = []
+
+def on_invalidate(callback):
+    """Registers callback(name) to run whenever a dataset is invalidated."""
+    _invalidate_hooks.append(callback)
+
+def invalidate(name):
+    """Drops the current pointer so the next load republishes fresh data."""
+    # An explicit refresh retries straight away, even during backoff
+    _clear_failure(name)
+    for callback in _invalidate_hooks:
+        callback(name)
+    try:
+        os.remove(_pointer_path(name))
+    except OSError:
+        pass
+
+def _string_types(arrow_type):
+    if pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+def attach(info):
+    """Returns a read-only frame backed by the memory-mapped Arrow file."""
+    with _attached_lock:
+        cached = _attached.get(info["name"])
+        if cached is not None and cached[0] == info["path"]:
+            return cached[1]
+
+        source = pa.memory_map(info["path"], "r")
+        table = pa.ipc.open_file(source).read_all()
+        # Text stays in the mapped buffers; null-free numeric columns are
+        # wrapped as read-only numpy views thanks to split_blocks
+        df = table.to_pandas(types_mapper=_string_types, split_blocks=True)
+        df.attrs["dataset_version"] = info["version"]
+        _attached[info["name"]] = (info["path"], df)
+        return df
+
+def attached_frames():
+    """Returns {name: (path, frame)} for every dataset this process has attached."""
+    with _attached_lock:
+        return dict(_attached)
+
+def _is_fresh(info, ttl):
+    if info is None or not os.path.exists(info["path"]):
+        return False
+    return ttl is None or time.time() - info["published_at"] < ttl
+
+def needs_refresh(name, ttl=None):
+    """True if the next load_shared() call for this dataset will run its loader."""
+    return not _is_fresh(current(name), ttl) and _retry_due(name)
+
+def load_shared(name, loader, ttl=None, record_failure=True):
+    """Loads a dataset through the host-wide store.
+
+    The first worker to find the dataset missing or older than ttl seconds
+    calls loader() and publishes the result; everyone else attaches to it.
+    Returns a shallow copy so callers can add columns without touching the
+    shared view. When the loader fails (returns None), the previous version
+    keeps being served and the loader is retried with exponential backoff
+    rather than on every rerun. Background refreshes pass
+    record_failure=False so a failure never delays a foreground load.
+    """
+    _loaders[name] = (loader, ttl)
+    info = current(name)
+    if needs_refresh(name, ttl):
+        with _publish_lock(name):
+            # Another worker may have published (or failed) while we waited
+            info = current(name)
+            if needs_refresh(name, ttl):
+                df = loader()
+                if df is None:
+                    if record_failure:
+                        _record_failure(name)
+                else:
+                    info = publish(name, df)
+
+    for _ in range(2):
+        if info is None:
+            return None
+        try:
+            return attach(info).copy(deep=False)
+        except OSError:
+            # Another worker published and pruned this version after we read
+            # the pointer; the pointer now names its replacement
+            info = current(name)
+    return None
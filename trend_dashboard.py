@@ -0,0 +1,84 @@
+import datetime
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from trend_store import load_trends, trend_extent
+
+GROUP_COLUMNS = {"Source": "source", "Category": "category", "Region": "region"}
+
+@st.cache_data(ttl=300)  # Aggregates only change when a source refreshes
+def get_trends(start, end, sources):
+    """Loads daily counts for the selected range from the trend store."""
+    return load_trends(start, end, sources)
+
+def create_trend_chart(trends, freq, group_by, top_n=8):
+    """Creates the postings-over-time line chart without displaying it."""
+    if trends is None or trends.empty:
+        return None
+
+    group_col = GROUP_COLUMNS[group_by]
+    trends = trends.copy()
+    trends[group_col] = trends[group_col].astype(str)
+
+    # Keep the chart readable: the busiest groups, everything else as "Other"
+    top_groups = trends.groupby(group_col)["count"].sum().nlargest(top_n).index
+    trends.loc[~trends[group_col].isin(top_groups), group_col] = "Other"
+
+    rule = "W-MON" if freq == "Week" else "D"
+    bucketed = (
+        trends.groupby([pd.Grouper(key="date", freq=rule, label="left", closed="left"), group_col])["count"]
+        .sum()
+        .reset_index()
+    )
+
+    fig = px.line(
+        bucketed,
+        x="date",
+        y="count",
+        color=group_col,
+        markers=True,
+        labels={"date": freq, "count": "Number of Job Postings", group_col: group_by},
+        height=450
+    )
+    return fig
+
+def main():
+    """Main function to run the posting trends dashboard."""
+    st.title("Job Posting Trends 📈")
+    st.markdown("Postings over time across all sources, answered from daily aggregates collected on every data refresh.")
+
+    first_date, last_date, sources = trend_extent()
+    if first_date is None:
+        st.info("No trend data yet. Open the other dashboards to collect postings.")
+        return
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        default_start = max(first_date, last_date - datetime.timedelta(days=90))
+        date_range = st.date_input(
+            "Date range",
+            value=(default_start, last_date),
+            min_value=first_date,
+            max_value=last_date
+        )
+    with col2:
+        freq = st.radio("Granularity", ["Day", "Week"], horizontal=True)
+    with col3:
+        group_by = st.selectbox("Group by", list(GROUP_COLUMNS))
+
+    selected_sources = st.multiselect("Sources", options=sources, default=sources)
+
+    # The date picker returns a single date while the user is mid-selection
+    if len(date_range) != 2 or not selected_sources:
+        st.warning("Select a start date, an end date and at least one source.")
+        return
+
+    start, end = date_range
+    trends = get_trends(start, end, tuple(selected_sources))
+
+    st.metric("Job Postings in Range", f"{int(trends['count'].sum()) if not trends.empty else 0}")
+    trend_chart = create_trend_chart(trends, freq, group_by)
+    if trend_chart is not None:
+        st.plotly_chart(trend_chart, use_container_width=True)
+    else:
+        st.warning("No postings in the selected range.")
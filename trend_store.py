@@ -0,0 +1,260 @@
+import glob
+import json
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Daily posting counts per (date, source, category, region), appended as small
+# Parquet parts on every ingest and merged once enough parts pile up.
+TREND_DIR = os.environ.get("JOB_HEATMAP_TREND_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "trend_store"
+)
+DAILY_DIR = os.path.join(TREND_DIR, "daily")
+MAX_PARTS = 32
+
+DATE_COLUMNS = ["created", "date_posted", "posted_date", "listing_date", "date"]
+REGION_COLUMNS = ["region", "state", "location"]
+
+# A posting is identified by its id or link when the sheet has one, otherwise
+# by these columns; anything else (salary edits, new columns) is not identity.
+# The choice is made on a source's first ingest and then kept (see _key_basis).
+ROW_KEY_COLUMNS = ["id", "job_id", "adref", "url", "redirect_url", "link", "job_link"]
+IDENTITY_COLUMNS = [
+    "title", "job_title", "company", "company_name", "location",
+    "category", "contract_type", "contract_time",
+] + DATE_COLUMNS
+
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("source", pa.dictionary(pa.int16(), pa.string())),
+    ("category", pa.dictionary(pa.int32(), pa.string())),
+    ("region", pa.dictionary(pa.int32(), pa.string())),
+    ("count", pa.int32()),
+])
+
+def _first_column(df, candidates):
+    for col in candidates:
+        if col in df.columns:
+            return col
+    return None
+
+def _seen_path(source, kind="keys"):
+    return os.path.join(TREND_DIR, f"{source}-seen-{kind}.npy")
+
+def _basis_path(source):
+    return os.path.join(TREND_DIR, f"{source}-basis.json")
+
+def _lock_path():
+    return os.path.join(TREND_DIR, "trends.lock")
+
+def _load_seen(source, kind):
+    path = _seen_path(source, kind)
+    return np.load(path) if os.path.exists(path) else np.zeros(0, dtype=np.uint64)
+
+def _save_seen(source, kind, values):
+    path = _seen_path(source, kind)
+    np.save(f"{path}.tmp.npy", values)
+    os.replace(f"{path}.tmp.npy", path)
+
+def _normalise(values):
+    """Text form of a column that survives int/float inference and stray spaces."""
+    text = values.astype(object).where(values.notna(), "").astype(str).str.strip().str.lower()
+    numbers = pd.to_numeric(values, errors="coerce")
+    whole = numbers.notna() & (numbers % 1 == 0) & (numbers.abs() < 2**53)
+    text[whole] = numbers[whole].astype("int64").astype(str)
+    return text
+
+def _key_basis(source, df):
+    """Columns this source's postings are keyed on, fixed on its first ingest.
+
+    Keys must not depend on the delivery: a blank id, a new column or a
+    reordered sheet would otherwise re-key every row and count it again.
+    """
+    path = _basis_path(source)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    basis = {
+        "id_column": _first_column(df, ROW_KEY_COLUMNS),
+        "identity_columns": sorted(col for col in df.columns if col in IDENTITY_COLUMNS)
+        or sorted(map(str, df.columns)),
+    }
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(basis, f)
+    os.replace(f"{path}.tmp", path)
+    return basis
+
+def _column(df, col):
+    # Columns of the basis that a later delivery lacks read as blank
+    if col in df.columns:
+        return _normalise(df[col])
+    return pd.Series("", index=df.index)
+
+def row_keys(df, basis):
+    """Returns (id keys, identity keys, has_id) per row for a key basis.
+
+    Id keys hash the id/link column; identity keys hash the basis' identity
+    columns. Rows with a blank id (or sources without an id column) are
+    keyed by identity alone.
+    """
+    identity = pd.DataFrame({col: _column(df, col) for col in basis["identity_columns"]})
+    identity_keys = pd.util.hash_pandas_object(identity, index=False).to_numpy()
+
+    if basis["id_column"] is None:
+        return identity_keys, identity_keys, np.zeros(len(df), dtype=bool)
+    ids = _column(df, basis["id_column"])
+    id_keys = pd.util.hash_pandas_object("id:" + ids, index=False).to_numpy()
+    return id_keys, identity_keys, (ids != "").to_numpy()
+
+def _write_part(frame, label):
+    frame = frame.astype({"source": "category", "category": "category", "region": "category"})
+    table = pa.Table.from_pandas(frame[SCHEMA.names], preserve_index=False).cast(SCHEMA)
+    path = os.path.join(DAILY_DIR, f"part-{label}-{time.time_ns()}.parquet")
+    pq.write_table(table, f"{path}.tmp", compression="zstd")
+    os.replace(f"{path}.tmp", path)
+
+def _compact():
+    """Merges all daily parts into one when there are too many."""
+    parts = sorted(glob.glob(os.path.join(DAILY_DIR, "part-*.parquet")))
+    if len(parts) <= MAX_PARTS:
+        return
+    daily = pq.read_table(parts).to_pandas()
+    merged = daily.groupby(["date", "source", "category", "region"], observed=True)["count"].sum().reset_index()
+    _write_part(merged, "compacted")
+    for part in parts:
+        os.remove(part)
+
+def daily_counts(source, df):
+    """Counts postings per day, category and region for one source's rows."""
+    date_col = _first_column(df, DATE_COLUMNS)
+    if date_col is not None:
+        dates = pd.to_datetime(df[date_col], errors="coerce", utc=True).dt.tz_localize(None).dt.normalize()
+    else:
+        dates = pd.Series(pd.NaT, index=df.index)
+    # Rows without a posting date count on the day they were first seen
+    dates = dates.fillna(pd.Timestamp.now().normalize())
+
+    region_col = _first_column(df, REGION_COLUMNS)
+    keys = pd.DataFrame({
+        "date": dates.dt.date,
+        "source": source,
+        "category": df["category"].astype(object).fillna("Unknown").astype(str) if "category" in df.columns else "Unknown",
+        "region": df[region_col].astype(object).fillna("Unknown").astype(str) if region_col else "Unknown",
+    })
+    counts = keys.groupby(["date", "source", "category", "region"]).size().reset_index(name="count")
+    return counts
+
+def ingest(source, df):
+    """Appends counts for rows of df that this source has not delivered before.
+
+    Returns the number of newly counted rows. Raw rows are never stored; only
+    sorted arrays of 64-bit row keys (see row_keys) are kept to skip
+    re-delivered rows.
+    """
+    if df is None or df.empty:
+        return 0
+
+    try:
+        return _ingest(source, df)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        # Trends are best-effort; never fail a dashboard load because of them
+        logger.warning("Trend ingest failed for %s: %s", source, e)
+        return 0
+
+def _ingest(source, df):
+    with file_lock(_lock_path()):
+        os.makedirs(DAILY_DIR, exist_ok=True)
+        id_keys, identity_keys, has_id = row_keys(df, _key_basis(source, df))
+        # keys: each counted row's primary key (its id key, or identity key
+        # when it had no id); identities: identity keys of every counted row
+        seen_keys = _load_seen(source, "keys")
+        seen_identities = _load_seen(source, "identities")
+
+        # A row with an id is new unless that id, or the same posting without
+        # an id, was counted; a row without one is new unless its identity was
+        is_new = np.where(
+            has_id,
+            ~np.isin(id_keys, seen_keys) & ~np.isin(identity_keys, seen_keys),
+            ~np.isin(identity_keys, seen_identities),
+        )
+        if not is_new.any():
+            return 0
+
+        _write_part(daily_counts(source, df[is_new]), source)
+        primary_keys = np.where(has_id, id_keys, identity_keys)
+        _save_seen(source, "keys", np.union1d(seen_keys, primary_keys[is_new]))
+        _save_seen(source, "identities", np.union1d(seen_identities, identity_keys[is_new]))
+        _compact()
+    return int(is_new.sum())
+
+def load_trends(start=None, end=None, sources=None):
+    """Reads daily counts within [start, end], optionally for some sources."""
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", start))
+    if end is not None:
+        filters.append(("date", "<=", end))
+    if sources:
+        filters.append(("source", "in", list(sources)))
+
+    # Shared lock: compaction never swaps parts while they are being read
+    with file_lock(_lock_path(), shared=True):
+        parts = glob.glob(os.path.join(DAILY_DIR, "part-*.parquet"))
+        if not parts:
+            return pd.DataFrame(columns=SCHEMA.names)
+        table = pq.read_table(parts, filters=filters or None)
+    trends = table.to_pandas()
+    trends["date"] = pd.to_datetime(trends["date"])
+    return trends
+
+def trend_extent():
+    """Returns (first date, last date, sources) covered by the aggregates."""
+    with file_lock(_lock_path(), shared=True):
+        parts = glob.glob(os.path.join(DAILY_DIR, "part-*.parquet"))
+        if not parts:
+            return None, None, []
+        table = pq.read_table(parts, columns=["date", "source"])
+    dates = table.column("date").to_pandas()
+    sources = sorted(table.column("source").to_pandas().astype(str).unique())
+    return dates.min(), dates.max(), sources
+
+def check_dedup():
+    """Re-delivering the same postings must count nothing: after columns are
+    added, an id is blanked, or ids come back as floats in another order."""
+    import tempfile
+    global TREND_DIR, DAILY_DIR
+    TREND_DIR = tempfile.mkdtemp(prefix="trend_store_check_")
+    DAILY_DIR = os.path.join(TREND_DIR, "daily")
+
+    postings = pd.DataFrame({
+        "id": [101, 102, 103],
+        "title": ["Registered Nurse", "Chef", "Teacher"],
+        "location": ["Geelong", "Sale", "Bendigo"],
+        "category": ["Healthcare", "Hospitality", "Teaching"],
+    })
+    blanked = postings.astype({"id": object})
+    blanked.loc[0, "id"] = None
+    redeliveries = [
+        postings.assign(contract_type="permanent", date="2026-01-05"),
+        blanked,
+        postings.iloc[::-1].astype({"id": float}),
+    ]
+    for source, first in [("with-id", postings), ("without-id", postings.drop(columns="id"))]:
+        assert _ingest(source, first) == 3
+        for frame in redeliveries:
+            if "id" not in first.columns:
+                frame = frame.drop(columns="id")
+            assert _ingest(source, frame) == 0, f"{source}: re-delivery counted again"
+    assert load_trends()["count"].sum() == 6
+    print("Trend dedup check passed.")
+
+if __name__ == "__main__":
+    check_dedup()
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+def dataset_version(df):
+    """Returns a short content hash identifying this version of a dataset."""
+    if df is None:
+        return None
+
+    # The shared store stamps the version once so reruns don't rehash the frame
+    version = df.attrs.get("dataset_version")
+    if version is not None:
+        return version
+
+    digest = hashlib.sha1()
+    digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+@contextmanager
+def file_lock(path, shared=False):
+    """Holds a lock on path across all processes on the host.
+
+    The lock is exclusive unless shared=True; shared holders (readers) only
+    exclude exclusive ones (writers).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class SizedCache:
+    """Thread-safe LRU cache that knows how many bytes its values hold.
+
+    sizeof(value) gives an entry's size. Entries beyond max_entries are
+    dropped oldest first, and evict_bytes() frees memory on demand.
+    """
+
+    def __init__(self, max_entries, sizeof):
+        self._entries = OrderedDict()  # key -> (value, nbytes), least recent first
+        self._max_entries = max_entries
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        nbytes = self._sizeof(value)
+        with self._lock:
+            self._entries[key] = (value, nbytes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._entries.values())
+
+    def evict_bytes(self, nbytes):
+        """Drops least recently used entries until nbytes are freed.
+
+        The most recently used entry is kept, since the current page is
+        using it. Returns the bytes actually freed.
+        """
+        freed = 0
+        with self._lock:
+            while freed < nbytes and len(self._entries) > 1:
+                _, (_, size) = self._entries.popitem(last=False)
+                freed += size
+        return freed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()